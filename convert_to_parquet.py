@@ -1,27 +1,62 @@
-import json
-import pandas as pd
 import os
+import pyarrow as pa
+import pyarrow.json as paj
+import pyarrow.parquet as pq
 
-# JSON 파일 읽기
-json_path = "json_data/preprocessed_reviews.json"
+# JSON Lines 샤드 디렉토리 (preprocessing.py 출력)
+json_dir = "json_data/preprocessed_reviews"
 output_dir = "parquet_data"
 
-print(f"Loading JSON from {json_path}...")
-with open(json_path, "r", encoding="utf-8") as f:
-    data = json.load(f)
+# Parquet 저장 옵션 (ZSTD 압축, 행 그룹/페이지 크기 조정)
+PARQUET_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "row_group_size": 500_000,
+    "use_dictionary": True,
+    "data_page_size": 1 << 20,
+}
 
-print(f"Total records: {len(data)}")
+# 출력 스키마 (DATA_SPECIFICATION.md 기준)
+SCHEMA = pa.schema([
+    ("review_id", pa.string()),
+    ("original_text", pa.string()),
+    ("cleaned_text", pa.string()),
+    ("date", pa.string()),
+    ("date_valid", pa.bool_()),
+    ("language", pa.string()),
+    ("rating", pa.int64()),
+    ("restaurant_name", pa.string()),
+    ("restaurant_place_id", pa.string()),
+    ("restaurant_grid", pa.string()),
+    ("restaurant_address", pa.string()),
+    ("restaurant_rating", pa.float64()),
+    ("restaurant_phone", pa.string()),
+    ("char_count", pa.int64()),
+    ("word_count", pa.int64()),
+])
 
-# DataFrame으로 변환
-df = pd.DataFrame(data)
+shard_paths = sorted(
+    os.path.join(json_dir, name)
+    for name in os.listdir(json_dir)
+    if name.endswith(".jsonl") and os.path.getsize(os.path.join(json_dir, name)) > 0
+)
+print(f"Loading {len(shard_paths)} JSON Lines shards from {json_dir}...")
 
-# 절반으로 분할
-mid_point = len(df) // 2
-df_part1 = df.iloc[:mid_point]
-df_part2 = df.iloc[mid_point:]
+# 샤드별로 Arrow 테이블로 바로 파싱 (pandas 중간 단계 없음) 후 이어 붙이기
+parse_options = paj.ParseOptions(explicit_schema=SCHEMA, unexpected_field_behavior="ignore")
+table = pa.concat_tables(
+    [paj.read_json(path, parse_options=parse_options) for path in shard_paths]
+)
 
-print(f"Part 1: {len(df_part1)} records")
-print(f"Part 2: {len(df_part2)} records")
+print(f"Total records: {table.num_rows}")
+
+# 절반으로 분할 (zero-copy slice)
+mid_point = table.num_rows // 2
+table_part1 = table.slice(0, mid_point)
+table_part2 = table.slice(mid_point)
+
+print(f"Part 1: {table_part1.num_rows} records")
+print(f"Part 2: {table_part2.num_rows} records")
 
 # parquet_data 디렉토리 생성 (없으면)
 os.makedirs(output_dir, exist_ok=True)
@@ -30,8 +65,8 @@ os.makedirs(output_dir, exist_ok=True)
 part1_path = os.path.join(output_dir, "reviews_part1.parquet")
 part2_path = os.path.join(output_dir, "reviews_part2.parquet")
 
-df_part1.to_parquet(part1_path, index=False)
-df_part2.to_parquet(part2_path, index=False)
+pq.write_table(table_part1, part1_path, **PARQUET_WRITE_OPTIONS)
+pq.write_table(table_part2, part2_path, **PARQUET_WRITE_OPTIONS)
 
 print(f"Saved: {part1_path}")
 print(f"Saved: {part2_path}")
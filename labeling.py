@@ -1,5 +1,5 @@
 import os
-import json
+import orjson
 import math
 import asyncio
 import pandas as pd
@@ -309,7 +309,7 @@ async def label_batch_async(
     ]
 
     user_msg = USER_TEMPLATE_BATCH.format(
-        reviews_json=json.dumps(reviews_payload, ensure_ascii=False, indent=2)
+        reviews_json=orjson.dumps(reviews_payload).decode()
     )
 
     try:
@@ -334,7 +334,7 @@ async def label_batch_async(
             )
 
         content = resp.choices[0].message.content.strip()
-        data_list = json.loads(content)
+        data_list = orjson.loads(content)
 
         # safety: 리스트 아닌 경우 예외 처리
         if not isinstance(data_list, list) or len(data_list) != len(texts):
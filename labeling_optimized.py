@@ -1,19 +1,25 @@
 import os
-import re
 import sys
-import json
-import math
+import shutil
+import time
+import codecs
+import orjson
 import asyncio
 import argparse
-import pandas as pd
+import httpx
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
 from pathlib import Path
-from datetime import datetime
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 # .env 파일에서 환경변수 로드
 load_dotenv()
-from tqdm.asyncio import tqdm_asyncio
+from tqdm import tqdm
 from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
 from openai import RateLimitError, APITimeoutError, APIConnectionError
 
@@ -21,9 +27,6 @@ from openai import RateLimitError, APITimeoutError, APIConnectionError
 # 설정
 # ============================================================
 
-# API 클라이언트
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 # 기본 경로
 DEFAULT_INPUT_DIR = "parquet_data"
 DEFAULT_OUTPUT_DIR = "parquet_data"
@@ -34,10 +37,50 @@ TEXT_COL = "cleaned_text"
 ID_COL = "review_id"
 
 # 성능 설정
-BATCH_SIZE = 50           # 한 번에 보낼 리뷰 개수
+BATCH_SIZE = 100          # 한 번에 보낼 최대 리뷰 개수
+BATCH_TOKEN_TARGET = 6000 # 배치당 목표 입력 토큰 수 (리뷰 길이에 따라 배치 크기 조절)
 MAX_CONCURRENCY = 10      # 동시 실행 배치 수
-CHECKPOINT_INTERVAL = 5   # N개 배치마다 체크포인트 저장
 MODEL = "gpt-4o-mini"     # 속도 우선 모델
+RPM_LIMIT = 500           # 분당 요청 수 한도 (계정 Tier에 맞게 조정)
+TPM_LIMIT = 200_000       # 분당 토큰 수 한도 (계정 Tier에 맞게 조정)
+API_TIMEOUT = 120         # API 요청 타임아웃 (초)
+
+
+def create_client() -> AsyncOpenAI:
+    """HTTP/2 연결 풀을 쓰는 API 클라이언트 생성 (동시 요청을 적은 연결로 다중화)"""
+    # SDK 기본 설정(타임아웃, 리다이렉트 등)은 유지하고 HTTP/2와 연결 수만 변경
+    http_client = DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=MAX_CONCURRENCY * 2,
+            max_keepalive_connections=MAX_CONCURRENCY * 2,
+        ),
+    )
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+
+
+# API 클라이언트 (CLI 설정 반영 후 run()에서 생성, 실행이 끝나면 닫음)
+client = None
+
+# 라벨 컬럼 (-2 ~ +2 점수, 0/1 플래그는 int8로 저장)
+SCORE_COLS = [
+    "food_score", "service_score", "ambience_score", "price_score",
+    "hygiene_score", "waiting_score", "accessibility_score",
+]
+FLAG_COLS = ["racism_flag", "cash_only_flag"]
+
+# 최종 Parquet 저장 옵션 (ZSTD 압축, 행 그룹/페이지 크기 조정)
+PARQUET_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "row_group_size": 500_000,
+    "use_dictionary": True,
+    "dictionary_pagesize_limit": 4 << 20,  # 사전 페이지 한도 상향 (comment 평문 인코딩 전환 방지)
+    "data_page_size": 1 << 20,
+}
+
+# comment는 중복이 많은 짧은 요약이므로 사전 인코딩 타입으로 보관
+COMMENT_TYPE = pa.dictionary(pa.int32(), pa.string())
 
 # ============================================================
 # 최적화된 프롬프트 (압축 버전)
@@ -67,13 +110,53 @@ Scoring guide:
 Rules:
 - Score 0 if aspect not mentioned
 - If mixed sentiment, use stronger absolute value
-- Output ONLY a JSON array, same order as input
-- Each object: id, all scores, both flags, comment"""
-
-USER_TEMPLATE = """Reviews JSON:
-{reviews_json}
-
-Return JSON array with keys: id, food_score, service_score, ambience_score, price_score, hygiene_score, waiting_score, accessibility_score, racism_flag, cash_only_flag, comment"""
+- Output a JSON object {"results": [...]} with one item per review, same order as input
+- Each item: id, all scores, both flags, comment"""
+
+# 고정 지시문을 앞에 두어 배치 간 동일한 프롬프트 접두부(prompt caching 대상)를 최대화
+USER_TEMPLATE = """Return {{"results": [...]}} with item keys: id, food_score, service_score, ambience_score, price_score, hygiene_score, waiting_score, accessibility_score, racism_flag, cash_only_flag, comment
+
+Reviews JSON:
+{reviews_json}"""
+
+# Structured Outputs 스키마 (항상 유효한 JSON, 점수/플래그 값 범위 강제)
+_SCORE_SCHEMA = {"type": "integer", "enum": [-2, -1, 0, 1, 2]}
+_FLAG_SCHEMA = {"type": "integer", "enum": [0, 1]}
+_LABEL_ITEM_PROPERTIES = {
+    "id": {"type": "integer"},
+    **{c: _SCORE_SCHEMA for c in SCORE_COLS},
+    **{c: _FLAG_SCHEMA for c in FLAG_COLS},
+    "comment": {"type": "string"},
+}
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "review_labels",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": _LABEL_ITEM_PROPERTIES,
+                        "required": list(_LABEL_ITEM_PROPERTIES),
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# OpenAI prompt caching 라우팅 키 (같은 접두부 요청을 같은 캐시로 보냄)
+PROMPT_CACHE_KEY = "review-labeler-v1"
+
+# 누적 토큰 사용량 (prompt caching 적중 확인용)
+token_usage = {"prompt_tokens": 0, "cached_tokens": 0}
 
 # ============================================================
 # 유틸리티 함수
@@ -87,79 +170,230 @@ def get_paths(input_file: str):
     # 출력 파일명 생성
     output_parquet = input_path.parent / f"{stem}_labeled.parquet"
     output_csv = Path(CHECKPOINT_DIR) / f"{stem}_labeled.csv"
-    checkpoint_file = Path(CHECKPOINT_DIR) / f"checkpoint_{stem}.json"
-    intermediate_file = Path(CHECKPOINT_DIR) / f"intermediate_{stem}.parquet"
+    checkpoint_dir = Path(CHECKPOINT_DIR) / f"checkpoint_{stem}"
     
     return {
         'input': input_path,
         'output_parquet': output_parquet,
         'output_csv': output_csv,
-        'checkpoint': checkpoint_file,
-        'intermediate': intermediate_file,
+        'checkpoint': checkpoint_dir,
     }
 
 
-def load_checkpoint(checkpoint_path: Path):
-    """체크포인트 로드"""
-    if checkpoint_path.exists():
+def load_checkpoint(checkpoint_dir: Path, label_columns: "LabelColumns"):
+    """체크포인트 로드 (배치별 Parquet 파일에서 행 번호 + 라벨 컬럼만 읽어 복원)"""
+    if checkpoint_dir.exists() and any(checkpoint_dir.glob("batch_*.parquet")):
         try:
-            with open(checkpoint_path, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-                print(f"✓ 체크포인트 발견: 배치 {checkpoint['last_batch']+1}부터 재시작")
-                return checkpoint
+            table = pads.dataset(checkpoint_dir, format="parquet").to_table(
+                columns=["row", *LabelColumns.INT_COLS, "comment"]
+            )
+            label_columns.restore(table)
+            print(f"✓ 체크포인트 발견: {label_columns.labeled_count():,}개 리뷰 라벨링 완료, 이어서 진행")
         except Exception as e:
             print(f"⚠ 체크포인트 로드 실패: {e}")
-    return None
 
 
-def save_checkpoint(checkpoint_path: Path, last_batch: int, all_labels: list, completed_batches: set):
-    """체크포인트 저장"""
-    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
-    checkpoint = {
-        'last_batch': last_batch,
-        'labels': all_labels,
-        'completed_batches': list(completed_batches),
-        'timestamp': datetime.now().isoformat()
-    }
-    with open(checkpoint_path, 'w', encoding='utf-8') as f:
-        json.dump(checkpoint, f, ensure_ascii=False)
+def save_checkpoint(checkpoint_dir: Path, label_columns: "LabelColumns", start: int, end: int):
+    """완료된 배치 하나의 라벨만 별도 Parquet 파일로 저장 (전체 재저장 없음)"""
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    table = label_columns.to_table(start, end, null_unlabeled=True)
+    table = table.add_column(0, "row", pa.array(range(start, end), type=pa.int64()))
+
+    # 임시 파일에 먼저 저장 후 rename (중단 시 깨진 파일 방지)
+    # 파일명은 시작 행 기준 (배치 설정이 바뀌어도 기존 체크포인트와 충돌하지 않음)
+    path = checkpoint_dir / f"batch_{start:09d}.parquet"
+    temp_path = checkpoint_dir / f".tmp_{path.name}"
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+
+
+def make_batches(texts: list) -> list:
+    """토큰 수 기준 배치 경계 계산 (연속 구간을 BATCH_TOKEN_TARGET까지 채움, 최대 BATCH_SIZE개)"""
+    batches = []
+    start = 0
+    batch_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = len(text) // 4
+        if i > start and (batch_tokens + tokens > BATCH_TOKEN_TARGET or i - start >= BATCH_SIZE):
+            batches.append((start, i))
+            start = i
+            batch_tokens = 0
+        batch_tokens += tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def cleanup_checkpoint(checkpoint_dir: Path):
+    """완료 후 체크포인트 삭제"""
+    if checkpoint_dir.exists():
+        shutil.rmtree(checkpoint_dir)
+        print("✓ 체크포인트 파일 정리 완료")
+
 
+# ============================================================
+# 라벨 컬럼 저장소
+# ============================================================
 
-def save_intermediate(intermediate_path: Path, df_original: pd.DataFrame, all_labels: list):
-    """중간 결과 저장 (Parquet) - 임시 파일 사용으로 안전한 저장"""
-    intermediate_path.parent.mkdir(parents=True, exist_ok=True)
+class LabelColumns:
+    """
+    라벨 결과를 컬럼별 NumPy 배열로 보관
 
-    # None이 아닌 라벨만 있는 행 확인
-    valid_indices = [i for i, label in enumerate(all_labels) if label is not None]
+    배치 결과를 행 인덱스 위치에 슬라이스 단위로 채워 넣어, 리뷰별 dict 리스트와
+    DataFrame 변환 없이 Arrow 테이블로 만든다.
+    실패/미처리 행은 점수·플래그 0, comment None으로 남는다.
+    """
 
-    if not valid_indices:
-        return
+    INT_COLS = SCORE_COLS + FLAG_COLS
+
+    def __init__(self, n: int):
+        self.n = n
+        self.int_columns = {c: np.zeros(n, dtype=np.int8) for c in self.INT_COLS}
+        self.comments = np.full(n, None, dtype=object)
+        self.labeled = np.zeros(n, dtype=bool)
+
+    def assign(self, indices, labels: list) -> int:
+        """배치 결과를 해당 행에 기록하고 성공한 행 수를 반환"""
+        rows, values, comments = [], [], []
+        for idx, label in zip(indices, labels):
+            if label is None:
+                continue
+            try:
+                row_values = [int(label.get(c) or 0) for c in self.INT_COLS]
+            except (TypeError, ValueError):
+                continue
+            # int8 범위를 벗어나는 값은 실패로 처리
+            if not all(-128 <= v <= 127 for v in row_values):
+                continue
+            rows.append(idx)
+            values.append(row_values)
+            comments.append(label.get("comment"))
+        if not rows:
+            return 0
+
+        rows = np.asarray(rows)
+        matrix = np.asarray(values, dtype=np.int8)
+        for j, c in enumerate(self.INT_COLS):
+            self.int_columns[c][rows] = matrix[:, j]
+        self.comments[rows] = comments
+        self.labeled[rows] = True
+        return len(rows)
+
+    def labeled_count(self) -> int:
+        return int(self.labeled.sum())
+
+    def is_complete(self, start: int, end: int) -> bool:
+        """[start, end) 행이 모두 라벨링되었는지 확인"""
+        return bool(self.labeled[start:end].all())
+
+    def failed_indices(self) -> list:
+        return np.flatnonzero(~self.labeled).tolist()
+
+    def restore(self, table: pa.Table):
+        """체크포인트 테이블(row + 라벨 컬럼)에서 라벨링된 행 복원"""
+        table = table.filter(pc.is_valid(table[self.INT_COLS[0]]))
+        rows = table["row"].to_numpy()
+        for c in self.INT_COLS:
+            self.int_columns[c][rows] = table[c].to_numpy()
+        self.comments[rows] = table["comment"].to_pylist()
+        self.labeled[rows] = True
+
+    def to_table(self, start: int = 0, end: int = None, null_unlabeled: bool = False) -> pa.Table:
+        """[start, end) 행을 Arrow 테이블로 변환 (mask 없는 int8 컬럼은 버퍼 복사 없이 감쌈)"""
+        end = self.n if end is None else end
+        mask = ~self.labeled[start:end] if null_unlabeled else None
+        columns = {
+            c: pa.array(arr[start:end], type=pa.int8(), mask=mask)
+            for c, arr in self.int_columns.items()
+        }
+        columns["comment"] = pa.array(self.comments[start:end], type=pa.string(), mask=mask).cast(COMMENT_TYPE)
+        return pa.table(columns)
+
+
+def append_columns(table: pa.Table, extra: pa.Table) -> pa.Table:
+    """테이블 오른쪽에 다른 테이블의 컬럼 추가 (행 순서 기준)"""
+    for name, col in zip(extra.column_names, extra.columns):
+        table = table.append_column(name, col)
+    return table
+
+
+def csv_compatible(table: pa.Table) -> pa.Table:
+    """CSV 저장용 테이블 (사전 인코딩 → 일반 문자열, bool → 기존 pandas 출력과 같은 True/False)"""
+    for i, field in enumerate(table.schema):
+        col = table.column(i)
+        if pa.types.is_dictionary(field.type):
+            col = col.cast(pa.string())
+        elif pa.types.is_boolean(field.type):
+            col = pc.if_else(col, "True", "False")
+        else:
+            continue
+        table = table.set_column(i, field.name, col)
+    return table
 
-    # 유효한 라벨로 DataFrame 생성
-    labels_df = pd.DataFrame([all_labels[i] if all_labels[i] else {} for i in range(len(all_labels))])
-    df_partial = pd.concat([df_original.reset_index(drop=True), labels_df.reset_index(drop=True)], axis=1)
 
-    # 임시 파일에 먼저 저장 후 rename (원자적 파일 쓰기)
-    temp_path = intermediate_path.parent / f".tmp_{intermediate_path.name}"
-    try:
-        df_partial.to_parquet(temp_path, index=False)
-        # 기존 파일 삭제 후 rename
-        if intermediate_path.exists():
-            intermediate_path.unlink()
-        temp_path.rename(intermediate_path)
-        print(f"  💾 중간 저장 완료: {len(valid_indices)}/{len(all_labels)} 리뷰 처리됨")
-    except Exception as e:
-        # 임시 파일 정리
-        if temp_path.exists():
-            temp_path.unlink()
-        raise e
+# ============================================================
+# Rate Limiter (RPM/TPM)
+# ============================================================
 
+class RateLimiter:
+    """
+    분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 제한하는 토큰 버킷
 
-def cleanup_checkpoint(checkpoint_path: Path):
-    """완료 후 체크포인트 삭제"""
-    if checkpoint_path.exists():
-        checkpoint_path.unlink()
-        print("✓ 체크포인트 파일 정리 완료")
+    세마포어는 동시 실행 수만 제한하므로, 한도 초과(429) 후 재시도 대기로
+    시간을 버리지 않도록 요청 전에 처리량을 맞춘다.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int):
+        """요청 1개와 tokens만큼의 토큰을 확보할 때까지 대기"""
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (tokens - self._tokens) * 60 / self.tpm,
+                )
+                await asyncio.sleep(wait)
+
+
+# 동시성/처리량 제한 (여러 파일을 동시에 처리해도 전체 한도를 공유)
+# Python 3.9에서는 Lock/Semaphore가 생성 시점의 이벤트 루프에 묶이므로 run()에서 루프 안에 생성
+sem = None
+limiter = None
+
+
+def record_usage(resp):
+    """응답의 입력 토큰/캐시 적중 토큰 누적"""
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return
+    token_usage["prompt_tokens"] += usage.prompt_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    token_usage["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+
+
+def estimate_tokens(messages: list) -> int:
+    """메시지 길이 기반 대략적인 입력 토큰 수 (4글자 ≈ 1토큰)"""
+    return sum(len(m["content"]) for m in messages) // 4
 
 
 # ============================================================
@@ -172,27 +406,57 @@ def cleanup_checkpoint(checkpoint_path: Path):
     stop=stop_after_attempt(5),
     before_sleep=lambda retry_state: print(f"  ⏳ 재시도 대기 중... (시도 {retry_state.attempt_number}/5)")
 )
-async def call_api(messages: list, sem: asyncio.Semaphore):
-    """API 호출 (Rate Limit 대응)"""
+async def call_api(messages: list) -> str:
+    """API 호출 (Rate Limit 대응, 스트리밍 응답 조각을 모아 본문 반환)"""
     async with sem:
-        resp = await client.chat.completions.create(
+        await limiter.acquire(estimate_tokens(messages))
+        stream = await client.chat.completions.create(
             model=MODEL,
             temperature=0,
             messages=messages,
-            timeout=120
+            response_format=RESPONSE_FORMAT,
+            timeout=API_TIMEOUT,
+            stream=True,
+            stream_options={"include_usage": True},
+            extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
         )
-        return resp
+        parts = []
+        async with stream:
+            async for chunk in stream:
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.delta.content:
+                        parts.append(choice.delta.content)
+                # 사용량은 마지막 청크에만 포함됨
+                record_usage(chunk)
+        return "".join(parts)
+
+
+def parse_labels(content: str, expected: int) -> list:
+    """응답 JSON 파싱 후 id 기준 정렬, id 제거 (스레드에서 실행)"""
+    # Structured Outputs로 형식이 보장되므로 코드블록/+숫자 보정 불필요
+    data = orjson.loads(content)
+    data_list = data.get("results") if isinstance(data, dict) else data
+    
+    if not isinstance(data_list, list) or len(data_list) != expected:
+        raise ValueError(f"Output mismatch: expected {expected}, got {len(data_list) if isinstance(data_list, list) else 'non-list'}")
+    
+    # id 기준 정렬 후 id 제거 (스키마는 순서까지 보장하지 않음)
+    data_list = sorted(data_list, key=lambda d: d.get("id", 0))
+    for d in data_list:
+        d.pop("id", None)
+    
+    return data_list
 
 
 async def label_batch_async(
     texts: list,
     batch_idx: int,
-    sem: asyncio.Semaphore,
 ) -> list:
     """배치 라벨링"""
     reviews_payload = [{"id": i, "text": str(t)} for i, t in enumerate(texts)]
     user_msg = USER_TEMPLATE.format(
-        reviews_json=json.dumps(reviews_payload, ensure_ascii=False)
+        reviews_json=orjson.dumps(reviews_payload).decode()
     )
     
     messages = [
@@ -201,32 +465,12 @@ async def label_batch_async(
     ]
     
     try:
-        resp = await call_api(messages, sem)
-        content = resp.choices[0].message.content.strip()
-        
-        # JSON 파싱 (마크다운 코드블록 제거)
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        content = content.strip()
-
-        # JSON 표준에서 허용하지 않는 +숫자 패턴 수정 (예: +1 -> 1, +2 -> 2)
-        content = re.sub(r':\s*\+(\d)', r': \1', content)
-
-        data_list = json.loads(content)
-        
-        if not isinstance(data_list, list) or len(data_list) != len(texts):
-            raise ValueError(f"Output mismatch: expected {len(texts)}, got {len(data_list) if isinstance(data_list, list) else 'non-list'}")
-        
-        # id 기준 정렬 후 id 제거
-        data_list = sorted(data_list, key=lambda d: d.get("id", 0))
-        for d in data_list:
-            d.pop("id", None)
+        content = await call_api(messages)
         
-        return data_list
+        # 파싱은 스레드에서 처리해 이벤트 루프가 다른 API 요청을 계속 보내도록 함
+        return await asyncio.to_thread(parse_labels, content, len(texts))
     
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"  ❌ [배치 {batch_idx}] JSON 파싱 오류: {e}")
         print(f"     원본 응답 (처음 500자): {content[:500]}")
         return [None] * len(texts)
@@ -235,6 +479,34 @@ async def label_batch_async(
         return [None] * len(texts)
 
 
+# ============================================================
+# 워커 풀 실행
+# ============================================================
+
+async def run_worker_pool(jobs: list, handler, desc: str):
+    """
+    작업 큐에 jobs를 넣고 MAX_CONCURRENCY개의 워커가 순서대로 꺼내 처리
+
+    배치마다 태스크를 만들지 않고 고정 개수의 워커만 돌린다.
+    """
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    with tqdm(total=len(jobs), desc=desc, unit="batch") as pbar:
+        async def worker():
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await handler(job)
+                pbar.update(1)
+
+        num_workers = min(MAX_CONCURRENCY, len(jobs))
+        await asyncio.gather(*(worker() for _ in range(num_workers)))
+
+
 # ============================================================
 # 실패한 항목 재처리
 # ============================================================
@@ -245,27 +517,25 @@ RETRY_MAX_ATTEMPTS = 3  # 최대 재처리 시도 횟수
 
 async def retry_failed_labels(
     texts: list,
-    all_labels: list,
-    sem: asyncio.Semaphore,
+    label_columns: LabelColumns,
     retry_batch_size: int = RETRY_BATCH_SIZE,
     max_attempts: int = RETRY_MAX_ATTEMPTS
-) -> list:
+) -> LabelColumns:
     """
-    실패한(None) 라벨들을 작은 배치로 재처리
+    실패한(미처리) 라벨들을 작은 배치로 재처리
 
     Args:
         texts: 전체 텍스트 리스트
-        all_labels: 전체 라벨 리스트 (None 포함)
-        sem: 세마포어
+        label_columns: 전체 라벨 컬럼 (미처리 행 포함)
         retry_batch_size: 재처리 배치 크기 (기본값: 10)
         max_attempts: 최대 재처리 시도 횟수 (기본값: 3)
 
     Returns:
-        재처리된 라벨 리스트
+        재처리된 라벨 컬럼
     """
     for attempt in range(1, max_attempts + 1):
         # 실패한 인덱스 찾기
-        failed_indices = [i for i, label in enumerate(all_labels) if label is None]
+        failed_indices = label_columns.failed_indices()
 
         if not failed_indices:
             print("  ✓ 모든 라벨링 성공!")
@@ -287,37 +557,29 @@ async def retry_failed_labels(
         retry_success = 0
         retry_fail = 0
 
-        async def retry_single_batch(batch_indices: list, batch_num: int):
+        async def retry_single_batch(job: tuple):
             nonlocal retry_success, retry_fail
 
+            batch_num, batch_indices = job
             batch_texts = [texts[idx] for idx in batch_indices]
-            labels = await label_batch_async(batch_texts, f"retry_{batch_num}", sem)
+            labels = await label_batch_async(batch_texts, f"retry_{batch_num}")
 
             # 결과 업데이트
-            for idx, label in zip(batch_indices, labels):
-                if label is not None:
-                    all_labels[idx] = label
-                    retry_success += 1
-                else:
-                    retry_fail += 1
+            success = label_columns.assign(batch_indices, labels)
+            retry_success += success
+            retry_fail += len(batch_indices) - success
 
         # 재처리 배치 실행
-        retry_tasks = [
-            retry_single_batch(batch_indices, i)
-            for i, batch_indices in enumerate(retry_batches)
-        ]
-
-        await tqdm_asyncio.gather(
-            *retry_tasks,
+        await run_worker_pool(
+            list(enumerate(retry_batches)),
+            retry_single_batch,
             desc=f"재처리 {attempt}차",
-            total=len(retry_batches),
-            unit="batch"
         )
 
         print(f"   - 재처리 결과: 성공 {retry_success}, 실패 {retry_fail}")
 
         # 모두 성공하면 종료
-        remaining_failed = sum(1 for label in all_labels if label is None)
+        remaining_failed = label_columns.n - label_columns.labeled_count()
         if remaining_failed == 0:
             print("  ✓ 재처리 완료! 모든 항목 성공")
             break
@@ -325,7 +587,7 @@ async def retry_failed_labels(
         # 다음 시도를 위해 배치 크기 더 줄이기
         retry_batch_size = max(1, retry_batch_size // 2)
 
-    return all_labels
+    return label_columns
 
 
 # ============================================================
@@ -348,124 +610,98 @@ async def main_async(input_file: str):
         print(f"❌ 입력 파일을 찾을 수 없습니다: {paths['input']}")
         sys.exit(1)
     
-    # 데이터 로드
-    df = pd.read_parquet(paths['input'])
-    
-    # 필수 컬럼 확인
-    if TEXT_COL not in df.columns:
+    # 필수 컬럼 확인 (Parquet 메타데이터만 읽음)
+    input_columns = pq.read_schema(paths['input']).names
+    if TEXT_COL not in input_columns:
         print(f"❌ 필수 컬럼 '{TEXT_COL}'이 없습니다.")
-        print(f"   사용 가능한 컬럼: {list(df.columns)}")
+        print(f"   사용 가능한 컬럼: {input_columns}")
         sys.exit(1)
     
-    texts = df[TEXT_COL].astype(str).tolist()
+    # 데이터 로드 (라벨링에 필요한 텍스트 컬럼만, pandas 거치지 않고 Arrow → list)
+    text_column = pq.read_table(str(paths['input']), columns=[TEXT_COL]).column(0)
+    texts = pc.fill_null(text_column.cast(pa.string()), "").to_pylist()
     n = len(texts)
-    num_batches = math.ceil(n / BATCH_SIZE)
+    batches = make_batches(texts)
+    num_batches = len(batches)
     
     print(f"📁 입력: {paths['input']}")
     print(f"📁 출력: {paths['output_parquet']}")
     print(f"📊 총 리뷰: {n:,}개")
-    print(f"📦 배치 크기: {BATCH_SIZE}, 총 배치: {num_batches}")
+    print(f"📦 배치 크기: 최대 {BATCH_SIZE}개 / {BATCH_TOKEN_TARGET:,} 토큰, 총 배치: {num_batches}")
     print(f"⚡ 동시 실행: {MAX_CONCURRENCY}")
+    print(f"🚦 처리량 한도: {RPM_LIMIT:,} RPM, {TPM_LIMIT:,} TPM")
     print(f"🤖 모델: {MODEL}")
     print("-" * 60)
     
-    # 체크포인트 확인
-    checkpoint = load_checkpoint(paths['checkpoint'])
-    if checkpoint:
-        all_labels = checkpoint['labels']
-        completed_batches = set(checkpoint.get('completed_batches', []))
-        pending_batches = [b for b in range(num_batches) if b not in completed_batches]
-    else:
-        all_labels = [None] * n
-        completed_batches = set()
-        pending_batches = list(range(num_batches))
+    # 체크포인트 확인 (라벨링되지 않은 행이 남은 배치만 처리)
+    label_columns = LabelColumns(n)
+    load_checkpoint(paths['checkpoint'], label_columns)
+    pending_batches = [
+        b for b, (start, end) in enumerate(batches)
+        if not label_columns.is_complete(start, end)
+    ]
     
     print(f"📋 처리 대기 배치: {len(pending_batches)}/{num_batches}")
     
-    # 세마포어 (동시성 제한)
-    sem = asyncio.Semaphore(MAX_CONCURRENCY)
-    
-    # 진행 상황 추적
-    processed_count = 0
     lock = asyncio.Lock()
     
     async def handle_batch(batch_idx: int):
-        nonlocal processed_count
-        
-        start = batch_idx * BATCH_SIZE
-        end = min((batch_idx + 1) * BATCH_SIZE, n)
+        start, end = batches[batch_idx]
         batch_texts = texts[start:end]
         
-        labels = await label_batch_async(batch_texts, batch_idx, sem)
+        labels = await label_batch_async(batch_texts, batch_idx)
         
         async with lock:
-            all_labels[start:end] = labels
-            completed_batches.add(batch_idx)
-            processed_count += 1
+            label_columns.assign(range(start, end), labels)
             
-            # 주기적 체크포인트 저장
-            if processed_count % CHECKPOINT_INTERVAL == 0:
-                save_checkpoint(paths['checkpoint'], batch_idx, all_labels, completed_batches)
-                save_intermediate(paths['intermediate'], df, all_labels)
+            # 배치 체크포인트 저장 (해당 배치만 추가 기록)
+            save_checkpoint(paths['checkpoint'], label_columns, start, end)
         
         return batch_idx
     
-    # 배치 처리 (진행률 표시)
-    tasks = [handle_batch(b) for b in pending_batches]
-    
+    # 배치 처리 (워커 풀, 진행률 표시)
     try:
-        await tqdm_asyncio.gather(
-            *tasks,
-            desc="라벨링 진행",
-            total=len(pending_batches),
-            unit="batch"
-        )
+        await run_worker_pool(pending_batches, handle_batch, desc=f"라벨링 진행 ({paths['input'].stem})")
     except KeyboardInterrupt:
-        print("\n⚠ 중단됨! 현재까지 결과 저장 중...")
-        try:
-            save_checkpoint(paths['checkpoint'], max(completed_batches) if completed_batches else 0, all_labels, completed_batches)
-            save_intermediate(paths['intermediate'], df, all_labels)
-            print("✓ 저장 완료. 다시 실행하면 이어서 진행됩니다.")
-        except Exception as save_err:
-            print(f"⚠ 저장 중 오류 발생: {save_err}")
+        print("\n⚠ 중단됨! 완료된 배치는 체크포인트에 저장되어 있습니다.")
+        print("✓ 다시 실행하면 이어서 진행됩니다.")
         return
     except Exception as e:
         print(f"\n❌ 오류 발생: {e}")
-        print("현재까지 결과 저장 중...")
-        try:
-            save_checkpoint(paths['checkpoint'], max(completed_batches) if completed_batches else 0, all_labels, completed_batches)
-            save_intermediate(paths['intermediate'], df, all_labels)
-            print("✓ 저장 완료. 다시 실행하면 이어서 진행됩니다.")
-        except Exception as save_err:
-            print(f"⚠ 저장 중 오류 발생: {save_err}")
+        print("✓ 완료된 배치는 체크포인트에 저장되어 있습니다. 다시 실행하면 이어서 진행됩니다.")
         raise
     
     # 실패한 항목 재처리
-    failed_count = sum(1 for label in all_labels if label is None)
+    failed_count = n - label_columns.labeled_count()
     if failed_count > 0:
         print("-" * 60)
         print(f"⚠ {failed_count}개 항목 라벨링 실패 - 재처리 시작")
-        all_labels = await retry_failed_labels(texts, all_labels, sem)
+        label_columns = await retry_failed_labels(texts, label_columns)
 
     # 최종 결과 저장
     print("-" * 60)
     print("💾 최종 결과 저장 중...")
 
-    # 재처리 후에도 실패한 항목은 빈 딕셔너리로 대체
-    final_labels = [label if label is not None else {} for label in all_labels]
-    labels_df = pd.DataFrame(final_labels)
-    df_labeled = pd.concat([df.reset_index(drop=True), labels_df.reset_index(drop=True)], axis=1)
+    # 원본 전체 컬럼은 최종 저장 시에만 다시 읽고, 라벨 컬럼을 컬럼 단위로 추가
+    # (재처리 후에도 실패한 항목은 점수/플래그 0, comment null)
+    table_labeled = append_columns(pq.read_table(paths['input']), label_columns.to_table())
+    # 청크가 잘게 나뉜 채로 쓰면 느리고 파일이 커지므로 한 번 합쳐서 저장
+    table_labeled = table_labeled.combine_chunks()
     
     # Parquet 저장
     paths['output_parquet'].parent.mkdir(parents=True, exist_ok=True)
-    df_labeled.to_parquet(paths['output_parquet'], index=False)
+    pq.write_table(table_labeled, paths['output_parquet'], **PARQUET_WRITE_OPTIONS)
     
     # CSV 저장
     paths['output_csv'].parent.mkdir(parents=True, exist_ok=True)
-    df_labeled.to_csv(paths['output_csv'], index=False, encoding="utf-8-sig")
+    with open(paths['output_csv'], 'wb') as f:
+        f.write(codecs.BOM_UTF8)  # 엑셀 호환 (utf-8-sig)
+        pacsv.write_csv(
+            csv_compatible(table_labeled), f, write_options=pacsv.WriteOptions(include_header=True)
+        )
     
     # 실패한 항목 확인
-    failed_count = sum(1 for label in all_labels if label is None)
+    failed_count = n - label_columns.labeled_count()
     success_count = n - failed_count
     
     print("=" * 60)
@@ -473,16 +709,15 @@ async def main_async(input_file: str):
     print(f"   - 성공: {success_count:,}/{n:,} ({success_count/n*100:.1f}%)")
     if failed_count > 0:
         print(f"   - 실패: {failed_count:,}개")
+    if token_usage["prompt_tokens"]:
+        cached_ratio = token_usage["cached_tokens"] / token_usage["prompt_tokens"] * 100
+        print(f"   - 입력 토큰 (누적): {token_usage['prompt_tokens']:,} (캐시 적중 {token_usage['cached_tokens']:,}, {cached_ratio:.1f}%)")
     print(f"   - Parquet: {paths['output_parquet']}")
     print(f"   - CSV: {paths['output_csv']}")
     print("=" * 60)
     
     # 체크포인트 정리
     cleanup_checkpoint(paths['checkpoint'])
-    
-    # 중간 파일 정리
-    if paths['intermediate'].exists():
-        paths['intermediate'].unlink()
 
 
 # ============================================================
@@ -490,12 +725,29 @@ async def main_async(input_file: str):
 # ============================================================
 
 async def process_multiple_files(input_files: list):
-    """여러 파일 순차 처리"""
+    """여러 파일 동시 처리 (세마포어/Rate Limiter는 전역으로 공유)"""
+    print(f"\n{'#' * 60}")
     for i, input_file in enumerate(input_files, 1):
-        print(f"\n{'#' * 60}")
         print(f"# 파일 {i}/{len(input_files)}: {input_file}")
-        print(f"{'#' * 60}\n")
-        await main_async(input_file)
+    print(f"{'#' * 60}\n")
+    await asyncio.gather(*(main_async(input_file) for input_file in input_files))
+
+
+async def run(input_files: list):
+    """실행 중인 이벤트 루프에서 API 클라이언트, 공유 세마포어/Rate Limiter를 만든 뒤 파일 처리"""
+    global client, sem, limiter
+    client = create_client()
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = RateLimiter(RPM_LIMIT, TPM_LIMIT)
+    
+    try:
+        if len(input_files) == 1:
+            await main_async(input_files[0])
+        else:
+            await process_multiple_files(input_files)
+    finally:
+        # 연결 풀 정리
+        await client.close()
 
 
 # ============================================================
@@ -532,7 +784,14 @@ Examples:
         '--batch-size', '-b',
         type=int,
         default=BATCH_SIZE,
-        help=f'배치 크기 (기본값: {BATCH_SIZE})'
+        help=f'배치당 최대 리뷰 개수 (기본값: {BATCH_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--batch-tokens',
+        type=int,
+        default=BATCH_TOKEN_TARGET,
+        help=f'배치당 목표 입력 토큰 수 (기본값: {BATCH_TOKEN_TARGET})'
     )
     
     parser.add_argument(
@@ -542,6 +801,20 @@ Examples:
         help=f'동시 실행 수 (기본값: {MAX_CONCURRENCY})'
     )
     
+    parser.add_argument(
+        '--rpm',
+        type=int,
+        default=RPM_LIMIT,
+        help=f'분당 요청 수 한도 (기본값: {RPM_LIMIT})'
+    )
+    
+    parser.add_argument(
+        '--tpm',
+        type=int,
+        default=TPM_LIMIT,
+        help=f'분당 토큰 수 한도 (기본값: {TPM_LIMIT})'
+    )
+    
     parser.add_argument(
         '--model', '-m',
         type=str,
@@ -568,7 +841,10 @@ if __name__ == "__main__":
     
     # 전역 설정 업데이트
     BATCH_SIZE = args.batch_size
+    BATCH_TOKEN_TARGET = args.batch_tokens
     MAX_CONCURRENCY = args.concurrency
+    RPM_LIMIT = args.rpm
+    TPM_LIMIT = args.tpm
     MODEL = args.model
     TEXT_COL = args.text_column
     
@@ -581,7 +857,4 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # 실행
-    if len(args.input_files) == 1:
-        asyncio.run(main_async(args.input_files[0]))
-    else:
-        asyncio.run(process_multiple_files(args.input_files))
+    asyncio.run(run(args.input_files))
@@ -11,15 +11,115 @@ Google Maps 리뷰 전처리 스크립트
 6. 클리닝 (URL, HTML, 제어문자 제거. 전화번호·이메일 마스킹. 다중 공백 정리)
 """
 
-import json
 import re
+import os
+import sys
+import mmap
+import zlib
+import orjson
+from tqdm import tqdm
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Set
-from collections import defaultdict
+from functools import lru_cache
+from hashlib import blake2b
+from itertools import repeat
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
 import unicodedata
 
 
+# 실제 이모지 범위 (감정, 기호·픽토그램, 교통·지도, 국기, 추가/최신 이모지, 기타 특수 기호)
+EMOJI_RANGES = [
+    (0x1F600, 0x1F64F), (0x1F300, 0x1F5FF), (0x1F680, 0x1F6FF), (0x1F1E0, 0x1F1FF),
+    (0x1F900, 0x1F9FF), (0x1FA70, 0x1FAFF), (0x2600, 0x26FF), (0x2700, 0x27BF),
+]
+
+
+def _to_char_class(codepoints) -> str:
+    """코드포인트 집합을 연속 구간으로 묶어 정규식 문자 클래스로 변환"""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    parts = (
+        re.escape(chr(a)) if a == b else f'{re.escape(chr(a))}-{re.escape(chr(b))}'
+        for a, b in ranges
+    )
+    return '[' + ''.join(parts) + ']'
+
+
+def _build_emoji_char_class() -> str:
+    """이모지로 볼 코드포인트 전체를 하나의 정규식 문자 클래스로 생성 (모듈 로드 시 1회)"""
+    codepoints = set()
+    for start, end in EMOJI_RANGES:
+        codepoints.update(range(start, end + 1))
+    # 유니코드 'So'(Symbol, other) 기호 추가 (ASCII·라틴 확장 제외, 기호 문자는 0x20000 미만에만 존재)
+    for cp in range(0x0250, 0x20000):
+        if unicodedata.category(chr(cp)) == 'So':
+            codepoints.add(cp)
+    return _to_char_class(codepoints)
+
+
+class _ControlCharTable(dict):
+    """str.translate용 제어 문자 삭제 테이블 (처음 보는 문자만 유니코드 범주 확인 후 캐시)"""
+    
+    KEEP = {ord('\t'), ord('\n'), ord('\r')}
+    
+    def __missing__(self, cp: int):
+        # 'C' 범주(제어·서식·미할당 등)는 삭제(None), 나머지는 그대로 유지
+        value = None if unicodedata.category(chr(cp))[0] == 'C' and cp not in self.KEEP else cp
+        self[cp] = value
+        return value
+
+
+# 클리닝 패턴 (URL, HTML 태그, 전화번호, 이메일)
+# URL: 기존 단일 문자 대안들(영문·숫자·$-_ 범위·!*(),·%XX)의 합집합을 문자 클래스 하나로 표현
+# ($-_ 범위가 A-Z, 숫자, %, @.&+(),* 등을 이미 포함)
+URL_PATTERN = r'https?://[!$-_a-z]+'
+
+HTML_TAG_PATTERN = r'<[^>]+>'
+
+PHONE_PATTERNS = [
+    # 한국 전화번호 패턴
+    r'\b0\d{1,2}-\d{3,4}-\d{4}\b',  # 02-1234-5678, 010-1234-5678
+    r'\b0\d{9,10}\b',  # 0212345678, 01012345678
+    # 미국 전화번호 패턴
+    r'\b\(\d{3}\)\s?\d{3}-\d{4}\b',  # (123) 456-7890
+    r'\b\d{3}-\d{3}-\d{4}\b',  # 123-456-7890
+]
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+
+# 정규식은 모듈 로드 시 한 번만 컴파일
+_URL_RE = re.compile(URL_PATTERN)
+_HTML_RE = re.compile(HTML_TAG_PATTERN)
+_PHONE_RES = [re.compile(pattern) for pattern in PHONE_PATTERNS]
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_SPACES_RE = re.compile(r'[ \t]+')
+_NEWLINES_RE = re.compile(r'\n{3,}')
+_LINE_TRIM_RE = re.compile(r'(?m)^[^\S\n]+|[^\S\n]+$')
+
+# 날짜 패턴 (상대 날짜 → 기준일과의 차이, 표준 형식, 유효성 검사)
+_RELATIVE_DATE_PATTERNS = [
+    (re.compile(r'(\d+)시간\s*전'), lambda x: timedelta(hours=x)),
+    (re.compile(r'(\d+)일\s*전'), lambda x: timedelta(days=x)),
+    (re.compile(r'(\d+)주\s*전'), lambda x: timedelta(weeks=x)),
+    (re.compile(r'(\d+)달\s*전'), lambda x: timedelta(days=x*30)),
+    (re.compile(r'(\d+)개월\s*전'), lambda x: timedelta(days=x*30)),
+    (re.compile(r'(\d+)년\s*전'), lambda x: timedelta(days=x*365)),
+]
+# YYYY.MM.DD, YYYY-MM-DD, YYYY/MM/DD 등
+_DATE_FORMAT_RES = [
+    re.compile(r'(\d{4})\.(\d{1,2})\.(\d{1,2})'),
+    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),
+    re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})'),
+]
+_DATE_VALID_RE = re.compile(r'\d{4}\.\d{2}\.\d{2}')
+
+
 class EmojiConverter:
     """이모지를 텍스트 태그로 변환"""
     
@@ -73,119 +173,71 @@ class EmojiConverter:
         '🍹': 'tropical_drink', '🧉': 'mate', '🍾': 'champagne',
     }
     
+    # 단일 코드포인트 이모지 → 태그 변환 테이블 (str.translate 한 번으로 처리)
+    _TRANSLATE_TABLE = {ord(k): f'[EMOJI_{v}]' for k, v in EMOJI_MAP.items() if len(k) == 1}
+    
+    # 여러 코드포인트 이모지 (☺️, ❤️ 등 이형 선택자 포함)는 정규식으로 처리
+    _MULTI_MAP = {k: f'[EMOJI_{v}]' for k, v in EMOJI_MAP.items() if len(k) > 1}
+    _MULTI_RE = re.compile('|'.join(re.escape(k) for k in _MULTI_MAP))
+    
+    # 남은 이모지 판별용 문자 클래스 (이모지 범위 + 라틴/한글/한자 외 'So' 기호)
+    _UNKNOWN_EMOJI_RE = re.compile(_build_emoji_char_class())
+    
     @classmethod
     def convert_emoji_to_tag(cls, text: str) -> str:
         """이모지를 [EMOJI_name] 형식으로 변환 (한글/영어/숫자는 변환하지 않음)"""
-        result = text
+        # 1단계: 매핑된 이모지 변환 (여러 코드포인트 이모지 먼저, 나머지는 translate)
+        result = cls._MULTI_RE.sub(lambda m: cls._MULTI_MAP[m.group(0)], text)
+        result = result.translate(cls._TRANSLATE_TABLE)
         
-        # 1단계: 매핑된 이모지 변환
-        for emoji, name in cls.EMOJI_MAP.items():
-            if emoji in result:
-                result = result.replace(emoji, f'[EMOJI_{name}]')
-        
-        # 2단계: 남은 이모지만 [EMOJI_unknown]으로 변환
-        # 각 문자를 검사하여 실제 이모지인지 확인
-        def is_emoji(char):
-            """문자가 이모지인지 확인 (영어, 스페인어, 한국어, 이탈리아어, 프랑스어 등 제외)"""
-            # 이미 변환된 태그는 건드리지 않음
-            if char == '[' or char == ']':
-                return False
-            
-            cp = ord(char)
-            
-            # 기본 ASCII 범위 제외 (영어, 숫자, 기본 기호)
-            if cp < 0x80:
-                return False
-            
-            # 라틴 확장 문자 제외 (스페인어, 이탈리아어, 프랑스어 등)
-            # Latin-1 Supplement: 0080-00FF (á, é, í, ó, ú, ñ, à, è, ç 등)
-            if 0x0080 <= cp <= 0x00FF:
-                return False
-            
-            # Latin Extended-A: 0100-017F (추가 라틴 문자)
-            if 0x0100 <= cp <= 0x017F:
-                return False
-            
-            # Latin Extended-B: 0180-024F (추가 라틴 문자)
-            if 0x0180 <= cp <= 0x024F:
-                return False
-            
-            # 한글 범위 제외 (AC00-D7AF: 한글 음절, 1100-11FF: 한글 자모)
-            if 0xAC00 <= cp <= 0xD7AF or 0x1100 <= cp <= 0x11FF:
-                return False
-            
-            # 실제 이모지 범위만 True
-            # 감정 이모티콘
-            if 0x1F600 <= cp <= 0x1F64F:
-                return True
-            # 기호 & 픽토그램
-            if 0x1F300 <= cp <= 0x1F5FF:
-                return True
-            # 교통 & 지도
-            if 0x1F680 <= cp <= 0x1F6FF:
-                return True
-            # 국기
-            if 0x1F1E0 <= cp <= 0x1F1FF:
-                return True
-            # 추가 이모지
-            if 0x1F900 <= cp <= 0x1F9FF:
-                return True
-            # 최신 이모지
-            if 0x1FA70 <= cp <= 0x1FAFF:
-                return True
-            # 기타 특수 이모지
-            if 0x2600 <= cp <= 0x26FF:
-                return True
-            if 0x2700 <= cp <= 0x27BF:
-                return True
-            
-            # 유니코드 카테고리로 추가 확인 (Symbol, other)
-            category = unicodedata.category(char)
-            if category == 'So':
-                # 단, CJK 통합 한자 등은 제외
-                if 0x4E00 <= cp <= 0x9FFF:  # CJK 통합 한자
-                    return False
-                if 0x3400 <= cp <= 0x4DBF:  # CJK 통합 한자 확장 A
-                    return False
-                return True
-            
-            return False
-        
-        # 문자별로 처리
-        converted = []
-        i = 0
-        in_tag = False
-        
-        while i < len(result):
-            char = result[i]
-            
-            # [EMOJI_xxx] 태그 내부는 건드리지 않음
-            if char == '[':
-                # 태그 시작인지 확인
-                if result[i:i+7] == '[EMOJI_':
-                    in_tag = True
-                    # 태그 끝까지 찾기
-                    end = result.find(']', i)
-                    if end != -1:
-                        converted.append(result[i:end+1])
-                        i = end + 1
-                        in_tag = False
-                        continue
-            
-            if not in_tag and is_emoji(char):
-                converted.append('[EMOJI_unknown]')
-            else:
-                converted.append(char)
-            
-            i += 1
-        
-        return ''.join(converted)
+        # 2단계: 남은 이모지만 [EMOJI_unknown]으로 변환 (태그는 ASCII라 매칭되지 않음)
+        return cls._UNKNOWN_EMOJI_RE.sub('[EMOJI_unknown]', result)
+
+
+# 날짜 표준화 기준일
+BASE_DATE = datetime(2025, 11, 16)
+
+
+@lru_cache(maxsize=4096)
+def _parse_relative_date(date_str: str) -> str:
+    """상대 날짜 변환 (날짜 문자열 종류가 적어 결과를 캐시)"""
+    if not date_str or date_str.strip() == '':
+        return ''
+    
+    # '수정일:' 접두사 제거
+    date_str = date_str.replace('수정일:', '').strip()
+    
+    # 한국어 패턴
+    for pattern, delta_func in _RELATIVE_DATE_PATTERNS:
+        match = pattern.search(date_str)
+        if match:
+            date = BASE_DATE - delta_func(int(match.group(1)))
+            return date.strftime('%Y.%m.%d')
+    
+    # 이미 표준 형식인 경우 반환
+    for fmt in _DATE_FORMAT_RES:
+        match = fmt.search(date_str)
+        if match:
+            year, month, day = match.groups()
+            return f"{year}.{month.zfill(2)}.{day.zfill(2)}"
+    
+    # 파싱 실패 시 원본 반환
+    return date_str
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_date(date_str: str) -> bool:
+    """날짜 형식 유효성 검사 (결과 캐시)"""
+    if not date_str:
+        return False
+    
+    return bool(_DATE_VALID_RE.match(date_str))
 
 
 class DateParser:
     """날짜 파싱 및 표준화 (2025.11.16 기준)"""
     
-    BASE_DATE = datetime(2025, 11, 16)
+    BASE_DATE = BASE_DATE
     
     @classmethod
     def parse_relative_date(cls, date_str: str) -> str:
@@ -193,118 +245,76 @@ class DateParser:
         상대적 날짜를 절대 날짜로 변환
         예: "16시간 전" -> "2025.11.15"
         """
-        if not date_str or date_str.strip() == '':
-            return ''
-        
-        # '수정일:' 접두사 제거
-        date_str = date_str.replace('수정일:', '').strip()
-        
-        # 한국어 패턴
-        patterns = {
-            r'(\d+)시간\s*전': lambda x: cls.BASE_DATE - timedelta(hours=int(x)),
-            r'(\d+)일\s*전': lambda x: cls.BASE_DATE - timedelta(days=int(x)),
-            r'(\d+)주\s*전': lambda x: cls.BASE_DATE - timedelta(weeks=int(x)),
-            r'(\d+)달\s*전': lambda x: cls.BASE_DATE - timedelta(days=int(x)*30),
-            r'(\d+)개월\s*전': lambda x: cls.BASE_DATE - timedelta(days=int(x)*30),
-            r'(\d+)년\s*전': lambda x: cls.BASE_DATE - timedelta(days=int(x)*365),
-        }
-        
-        for pattern, delta_func in patterns.items():
-            match = re.search(pattern, date_str)
-            if match:
-                date = delta_func(match.group(1))
-                return date.strftime('%Y.%m.%d')
-        
-        # 이미 표준 형식인 경우 반환
-        # YYYY.MM.DD, YYYY-MM-DD, YYYY/MM/DD 등
-        date_formats = [
-            r'(\d{4})\.(\d{1,2})\.(\d{1,2})',
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',
-            r'(\d{4})/(\d{1,2})/(\d{1,2})',
-        ]
-        
-        for fmt in date_formats:
-            match = re.search(fmt, date_str)
-            if match:
-                year, month, day = match.groups()
-                return f"{year}.{month.zfill(2)}.{day.zfill(2)}"
-        
-        # 파싱 실패 시 원본 반환
-        return date_str
+        return _parse_relative_date(date_str)
     
     @classmethod
     def is_valid_date(cls, date_str: str) -> bool:
         """날짜 형식이 유효한지 확인"""
-        if not date_str:
-            return False
-        
-        pattern = r'\d{4}\.\d{2}\.\d{2}'
-        return bool(re.match(pattern, date_str))
+        return _is_valid_date(date_str)
 
 
 class TextCleaner:
     """텍스트 정제 클래스"""
     
+    # URL/HTML 태그를 한 번에 찾는 통합 패턴 (둘 다 삭제)
+    _URL_HTML_RE = re.compile(f'{URL_PATTERN}|{HTML_TAG_PATTERN}')
+    
+    # 전화번호/이메일을 한 번에 찾는 통합 패턴 (그룹 이름으로 치환값 결정)
+    _MASK_RE = re.compile('|'.join([
+        '(?P<phone>' + '|'.join(PHONE_PATTERNS) + ')',
+        f'(?P<email>{EMAIL_PATTERN})',
+    ]))
+    _MASK_REPL = {'phone': '[PHONE]', 'email': '[EMAIL]'}
+    
+    # 통합 패턴이 매칭될 수 있는 텍스트인지 빠르게 확인 (이메일은 @,
+    # 전화번호는 항상 연속 숫자 3개 이상을 포함)
+    _NEEDS_MASK_RE = re.compile(r'@|\d{3}')
+    
+    # 제어 문자 삭제 테이블 (탭, 줄바꿈 제외)
+    _CONTROL_CHAR_TABLE = _ControlCharTable()
+    
     @staticmethod
     def remove_urls(text: str) -> str:
         """URL 제거"""
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        return re.sub(url_pattern, '', text)
+        if 'http' not in text:
+            return text
+        return _URL_RE.sub('', text)
     
     @staticmethod
     def remove_html_tags(text: str) -> str:
         """HTML 태그 제거"""
-        return re.sub(r'<[^>]+>', '', text)
+        return _HTML_RE.sub('', text)
     
-    @staticmethod
-    def remove_control_characters(text: str) -> str:
+    @classmethod
+    def remove_control_characters(cls, text: str) -> str:
         """제어 문자 제거 (탭, 줄바꿈 제외)"""
-        # 제어 문자 중 \t, \n, \r만 유지
-        return ''.join(char for char in text if unicodedata.category(char)[0] != 'C' or char in '\t\n\r')
+        return text.translate(cls._CONTROL_CHAR_TABLE)
     
     @staticmethod
     def mask_phone_numbers(text: str) -> str:
         """전화번호 마스킹"""
-        # 한국 전화번호 패턴
-        phone_patterns = [
-            r'\b0\d{1,2}-\d{3,4}-\d{4}\b',  # 02-1234-5678, 010-1234-5678
-            r'\b0\d{9,10}\b',  # 0212345678, 01012345678
-        ]
-        
-        # 미국 전화번호 패턴
-        us_phone_patterns = [
-            r'\b\(\d{3}\)\s?\d{3}-\d{4}\b',  # (123) 456-7890
-            r'\b\d{3}-\d{3}-\d{4}\b',  # 123-456-7890
-        ]
-        
         result = text
-        for pattern in phone_patterns + us_phone_patterns:
-            result = re.sub(pattern, '[PHONE]', result)
+        for pattern in _PHONE_RES:
+            result = pattern.sub('[PHONE]', result)
         
         return result
     
     @staticmethod
     def mask_emails(text: str) -> str:
         """이메일 마스킹"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return re.sub(email_pattern, '[EMAIL]', text)
+        return _EMAIL_RE.sub('[EMAIL]', text)
     
     @staticmethod
     def normalize_whitespace(text: str) -> str:
         """다중 공백 정리"""
-        # 탭을 공백으로 변환
-        text = text.replace('\t', ' ')
-        
-        # 연속된 공백을 하나로
-        text = re.sub(r' +', ' ', text)
+        # 연속된 공백/탭을 공백 하나로
+        text = _SPACES_RE.sub(' ', text)
         
         # 연속된 줄바꿈을 최대 2개로
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _NEWLINES_RE.sub('\n\n', text)
         
         # 각 줄의 앞뒤 공백 제거
-        lines = text.split('\n')
-        lines = [line.strip() for line in lines]
-        text = '\n'.join(lines)
+        text = _LINE_TRIM_RE.sub('', text)
         
         # 전체 텍스트의 앞뒤 공백 제거
         return text.strip()
@@ -315,34 +325,90 @@ class TextCleaner:
         if not text:
             return ''
         
-        # 1. URL 제거
-        text = cls.remove_urls(text)
-        
-        # 2. HTML 태그 제거
-        text = cls.remove_html_tags(text)
+        # 1. URL·HTML 태그 제거 (한 번의 패스, 대상이 없으면 생략)
+        if 'http' in text or '<' in text:
+            text = cls._URL_HTML_RE.sub('', text)
         
-        # 3. 제어 문자 제거
+        # 2. 제어 문자 제거 (URL 제거 후에 해야 제로폭 문자 등이 URL 끝을 구분)
         text = cls.remove_control_characters(text)
         
-        # 4. 전화번호 마스킹
-        text = cls.mask_phone_numbers(text)
+        # 3. 전화번호·이메일 마스킹 (한 번의 패스, 대상이 없으면 생략)
+        if cls._NEEDS_MASK_RE.search(text):
+            text = cls._MASK_RE.sub(lambda m: cls._MASK_REPL[m.lastgroup], text)
         
-        # 5. 이메일 마스킹
-        text = cls.mask_emails(text)
-        
-        # 6. 공백 정리
+        # 4. 공백 정리
         text = cls.normalize_whitespace(text)
         
         return text
 
 
+# 출력 샤드 수 (place_id 해시 기준)
+NUM_OUTPUT_SHARDS = 64
+
+
+def _shard_index(place_id) -> int:
+    """레스토랑 place_id의 출력 샤드 번호 (실행마다 같은 값이 나오도록 crc32 사용)"""
+    return zlib.crc32(str(place_id or '').encode()) % NUM_OUTPUT_SHARDS
+
+
+# 이 크기보다 큰 파일은 mmap으로 읽어 orjson에 바로 전달 (작은 파일은 read()가 더 빠름)
+MMAP_THRESHOLD = 64 * 1024
+
+
+def _load_json(file_path: Path):
+    """JSON 파일 로드 (큰 파일은 mmap 버퍼를 복사 없이 파싱)"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+            return orjson.loads(buf)
+
+
+def _intern(value):
+    """반복이 많은 범주형 문자열(언어 코드)을 intern해 같은 객체를 공유"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _review_id_key(review_id: str) -> int:
+    """중복 판단용 review_id 키 (blake2b 8바이트 다이제스트, 충돌 확률은 무시 가능한 수준)"""
+    return int.from_bytes(blake2b(str(review_id).encode(), digest_size=8).digest(), 'little')
+
+
+class PreprocessStats:
+    """전처리 통계 카운터 (고정 속성이라 문자열 키 생성·해시 없음)"""
+    
+    __slots__ = (
+        'processed',
+        'filtered_no_review_id',
+        'filtered_duplicate',
+        'filtered_empty_text',
+        'filtered_too_short',
+        'filtered_too_short_after_cleaning',
+        'errors',
+    )
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
 class ReviewPreprocessor:
     """리뷰 전처리 메인 클래스"""
     
+    # NULL/빈 값일 때 사용할 기본값 (리뷰마다 새로 만들지 않음)
+    NULL_DEFAULTS = {
+        'date': '',
+        'language': 'unknown',
+        'rating': 0,
+        'review_id': '',
+        'text': ''
+    }
+    
     def __init__(self, min_text_length: int = 20):
         self.min_text_length = min_text_length
-        self.seen_review_ids: Set[str] = set()
-        self.stats = defaultdict(int)
+        # review_id 원문 대신 64비트 해시만 보관 (중복 판단용 집합 메모리 절감)
+        self.seen_review_ids: Set[int] = set()
+        self.stats = PreprocessStats()
     
     def is_valid_review(self, review: Dict) -> tuple[bool, str]:
         """
@@ -354,10 +420,14 @@ class ReviewPreprocessor:
         if not review_id:
             return False, 'no_review_id'
         
-        if review_id in self.seen_review_ids:
+        if _review_id_key(review_id) in self.seen_review_ids:
             return False, 'duplicate'
         
         # 2. 텍스트 존재 및 길이 체크
+        return self.check_text(review)
+    
+    def check_text(self, review: Dict) -> tuple[bool, str]:
+        """텍스트 존재 및 길이 검증 (중복 여부와 무관)"""
         text = review.get('text', '')
         if text is None or text.strip() == '':
             return False, 'empty_text'
@@ -369,19 +439,10 @@ class ReviewPreprocessor:
     
     def handle_null_values(self, review: Dict) -> Dict:
         """NULL 값 처리"""
-        # 기본값 설정
-        defaults = {
-            'date': '',
-            'language': 'unknown',
-            'rating': 0,
-            'review_id': '',
-            'text': ''
-        }
-        
         processed = {}
-        for key, default_value in defaults.items():
+        for key, default_value in self.NULL_DEFAULTS.items():
             value = review.get(key)
-            if value is None or (isinstance(value, str) and value.strip() == ''):
+            if value is None or (isinstance(value, str) and not value.strip()):
                 processed[key] = default_value
             else:
                 processed[key] = value
@@ -395,17 +456,37 @@ class ReviewPreprocessor:
     
     def preprocess_review(self, review: Dict, restaurant_info: Dict) -> Optional[Dict]:
         """개별 리뷰 전처리"""
+        restaurant_fields = self.build_restaurant_fields(restaurant_info)
+        return self.register_review(*self.evaluate_review(review, restaurant_fields))
+    
+    @staticmethod
+    def build_restaurant_fields(restaurant_info: Dict) -> Dict:
+        """리뷰 레코드에 들어갈 레스토랑 정보 필드 (파일마다 한 번만 생성)"""
+        return {
+            'restaurant_name': restaurant_info.get('name', ''),
+            'restaurant_place_id': restaurant_info.get('place_id', ''),
+            'restaurant_grid': restaurant_info.get('grid', ''),
+            'restaurant_address': restaurant_info.get('address', ''),
+            'restaurant_rating': restaurant_info.get('rating', 0),
+            'restaurant_phone': restaurant_info.get('phone_number', ''),
+        }
+    
+    def evaluate_review(self, review: Dict, restaurant_fields: Dict) -> tuple:
+        """
+        중복 확인을 제외한 리뷰 전처리 (상태를 바꾸지 않아 병렬 워커에서 실행 가능)
+        Returns: (review_id, reason, processed_review)
+        """
         # 1. NULL 값 처리
         review = self.handle_null_values(review)
         
-        # 2. 유효성 검증
-        is_valid, reason = self.is_valid_review(review)
-        if not is_valid:
-            self.stats[f'filtered_{reason}'] += 1
-            return None
+        # 2. 유효성 검증 (중복 확인은 register_review에서 처리)
+        review_id = review.get('review_id', '')
+        if not review_id:
+            return review_id, 'no_review_id', None
         
-        # review_id 추가
-        self.seen_review_ids.add(review['review_id'])
+        is_valid, reason = self.check_text(review)
+        if not is_valid:
+            return review_id, reason, None
         
         # 3. 텍스트 전처리
         original_text = review['text']
@@ -418,11 +499,10 @@ class ReviewPreprocessor:
         
         # 클리닝 후 길이 재확인
         if len(cleaned_text.strip()) < self.min_text_length:
-            self.stats['filtered_too_short_after_cleaning'] += 1
-            return None
+            return review_id, 'too_short_after_cleaning', None
         
         # 4. 날짜 표준화
-        parsed_date = DateParser.parse_relative_date(review.get('date', ''))
+        parsed_date = _parse_relative_date(review.get('date', ''))
         
         # 5. 전처리된 리뷰 생성
         processed_review = {
@@ -430,31 +510,61 @@ class ReviewPreprocessor:
             'original_text': original_text,
             'cleaned_text': cleaned_text,
             'date': parsed_date,
-            'date_valid': DateParser.is_valid_date(parsed_date),
-            'language': review.get('language', 'unknown'),
+            'date_valid': _is_valid_date(parsed_date),
+            'language': _intern(review.get('language', 'unknown')),
             'rating': review.get('rating', 0),
             
             # 레스토랑 정보
-            'restaurant_name': restaurant_info.get('name', ''),
-            'restaurant_place_id': restaurant_info.get('place_id', ''),
-            'restaurant_grid': restaurant_info.get('grid', ''),
-            'restaurant_address': restaurant_info.get('address', ''),
-            'restaurant_rating': restaurant_info.get('rating', 0),
-            'restaurant_phone': restaurant_info.get('phone_number', ''),
+            **restaurant_fields,
             
             # 메타 정보
             'char_count': len(cleaned_text),
             'word_count': len(cleaned_text.split()),
         }
         
-        self.stats['processed'] += 1
+        return review_id, 'processed', processed_review
+    
+    def register_review(self, review_id: str, reason: str, processed_review: Optional[Dict]) -> Optional[Dict]:
+        """evaluate_review 결과에 중복 확인과 통계를 반영 (파일 순서대로 호출)"""
+        if reason == 'no_review_id':
+            self.stats.filtered_no_review_id += 1
+            return None
+        
+        review_key = _review_id_key(review_id)
+        if review_key in self.seen_review_ids:
+            self.stats.filtered_duplicate += 1
+            return None
+        
+        if reason == 'empty_text':
+            self.stats.filtered_empty_text += 1
+            return None
+        
+        if reason == 'too_short':
+            self.stats.filtered_too_short += 1
+            return None
+        
+        # review_id 추가 (클리닝 후 짧아 제외되는 리뷰도 중복 판단에 포함)
+        self.seen_review_ids.add(review_key)
+        
+        if reason == 'too_short_after_cleaning':
+            self.stats.filtered_too_short_after_cleaning += 1
+            return None
+        
+        self.stats.processed += 1
         return processed_review
     
     def process_restaurant_file(self, file_path: Path) -> List[Dict]:
         """레스토랑 파일 처리"""
+        return self.collect_file_results(*self.evaluate_file(file_path))
+    
+    def evaluate_file(self, file_path: Path) -> tuple:
+        """
+        레스토랑 파일의 리뷰별 evaluate_review 결과 (병렬 워커에서 실행 가능)
+        Returns: (outcomes, has_error)
+        """
+        outcomes = []
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _load_json(file_path)
             
             restaurant_info = {
                 'name': data.get('name'),
@@ -465,29 +575,38 @@ class ReviewPreprocessor:
                 'user_ratings_total': data.get('user_ratings_total'),
                 'phone_number': data.get('phone_number'),
             }
-            
-            processed_reviews = []
+            restaurant_fields = self.build_restaurant_fields(restaurant_info)
             
             for review in data.get('reviews', []):
-                processed = self.preprocess_review(review, restaurant_info)
-                if processed:
-                    processed_reviews.append(processed)
+                outcomes.append(self.evaluate_review(review, restaurant_fields))
             
-            return processed_reviews
+            return outcomes, False
             
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
-            self.stats['errors'] += 1
+            return outcomes, True
+    
+    def collect_file_results(self, outcomes: list, has_error: bool) -> List[Dict]:
+        """파일 하나의 evaluate_review 결과를 순서대로 등록하고 처리된 리뷰 반환"""
+        processed_reviews = []
+        for outcome in outcomes:
+            processed = self.register_review(*outcome)
+            if processed:
+                processed_reviews.append(processed)
+        
+        # 처리 중 에러가 난 파일은 결과를 버림 (에러 전까지의 통계·중복 판단은 유지)
+        if has_error:
+            self.stats.errors += 1
             return []
+        
+        return processed_reviews
     
     def process_all_files(self, input_dir: Path, output_dir: Path):
-        """모든 파일 처리"""
+        """모든 파일 처리 (저장된 리뷰 수 반환)"""
         input_dir = Path(input_dir)
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        all_processed_reviews = []
-        
         # 모든 JSON 파일 찾기
         json_files = list(input_dir.rglob('*.json'))
         total_files = len(json_files)
@@ -496,54 +615,73 @@ class ReviewPreprocessor:
         print(f"기준 날짜: {DateParser.BASE_DATE.strftime('%Y.%m.%d')}")
         print(f"최소 텍스트 길이: {self.min_text_length}자\n")
         
-        for idx, file_path in enumerate(json_files, 1):
-            if idx % 100 == 0:
-                print(f"진행 중: {idx}/{total_files} ({idx/total_files*100:.1f}%)")
-            
-            processed_reviews = self.process_restaurant_file(file_path)
-            all_processed_reviews.extend(processed_reviews)
-        
-        # 결과 저장
-        output_file = output_dir / 'preprocessed_reviews.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_processed_reviews, f, ensure_ascii=False, indent=2)
+        # 결과는 메모리에 모으지 않고 JSON Lines로 바로 저장 (한 줄에 리뷰 하나)
+        # place_id 해시 기준으로 샤드 파일을 나눠 파일 크기를 제한하고 병렬 로드 가능하게 함
+        output_path = output_dir / 'preprocessed_reviews'
+        output_path.mkdir(parents=True, exist_ok=True)
+        for old_shard in output_path.glob('reviews_*.jsonl'):
+            old_shard.unlink()
+        total_reviews = 0
+        
+        # 파일별 처리는 프로세스 풀에서 병렬 실행, 결과는 파일 순서대로 병합
+        with ExitStack() as stack:
+            executor = stack.enter_context(ProcessPoolExecutor())
+            shard_files = {}  # 샤드 번호 → 파일 (처음 쓸 때 생성)
+            results = executor.map(
+                _process_file_worker, json_files, repeat(self.min_text_length), chunksize=16
+            )
+            for outcomes, has_error in tqdm(results, total=total_files, desc="processing", unit="file"):
+                # 중복 확인·통계는 순차 처리와 같은 순서로 부모 프로세스에서 반영
+                for review in self.collect_file_results(outcomes, has_error):
+                    shard = _shard_index(review['restaurant_place_id'])
+                    f = shard_files.get(shard)
+                    if f is None:
+                        f = stack.enter_context(open(output_path / f'reviews_{shard:02x}.jsonl', 'wb'))
+                        shard_files[shard] = f
+                    f.write(orjson.dumps(review, option=orjson.OPT_APPEND_NEWLINE))
+                    total_reviews += 1
         
         # 통계 저장
         stats_output = {
             'total_files_processed': total_files,
-            'total_reviews_processed': self.stats['processed'],
-            'filtered_no_review_id': self.stats['filtered_no_review_id'],
-            'filtered_duplicate': self.stats['filtered_duplicate'],
-            'filtered_empty_text': self.stats['filtered_empty_text'],
-            'filtered_too_short': self.stats['filtered_too_short'],
-            'filtered_too_short_after_cleaning': self.stats['filtered_too_short_after_cleaning'],
-            'errors': self.stats['errors'],
+            'total_reviews_processed': self.stats.processed,
+            'filtered_no_review_id': self.stats.filtered_no_review_id,
+            'filtered_duplicate': self.stats.filtered_duplicate,
+            'filtered_empty_text': self.stats.filtered_empty_text,
+            'filtered_too_short': self.stats.filtered_too_short,
+            'filtered_too_short_after_cleaning': self.stats.filtered_too_short_after_cleaning,
+            'errors': self.stats.errors,
             'base_date': DateParser.BASE_DATE.strftime('%Y.%m.%d'),
             'min_text_length': self.min_text_length,
         }
         
         stats_file = output_dir / 'preprocessing_stats.json'
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(stats_output, f, ensure_ascii=False, indent=2)
+        with open(stats_file, 'wb') as f:
+            f.write(orjson.dumps(stats_output, option=orjson.OPT_INDENT_2))
         
         # 요약 출력
         print("\n" + "="*60)
         print("전처리 완료!")
         print("="*60)
-        print(f"✅ 처리된 리뷰: {self.stats['processed']:,}개")
+        print(f"✅ 처리된 리뷰: {self.stats.processed:,}개")
         print(f"❌ 필터링된 리뷰:")
-        print(f"   - review_id 없음: {self.stats['filtered_no_review_id']:,}개")
-        print(f"   - 중복: {self.stats['filtered_duplicate']:,}개")
-        print(f"   - 빈 텍스트: {self.stats['filtered_empty_text']:,}개")
-        print(f"   - 너무 짧음 (클리닝 전): {self.stats['filtered_too_short']:,}개")
-        print(f"   - 너무 짧음 (클리닝 후): {self.stats['filtered_too_short_after_cleaning']:,}개")
-        print(f"⚠️  에러: {self.stats['errors']:,}개")
+        print(f"   - review_id 없음: {self.stats.filtered_no_review_id:,}개")
+        print(f"   - 중복: {self.stats.filtered_duplicate:,}개")
+        print(f"   - 빈 텍스트: {self.stats.filtered_empty_text:,}개")
+        print(f"   - 너무 짧음 (클리닝 전): {self.stats.filtered_too_short:,}개")
+        print(f"   - 너무 짧음 (클리닝 후): {self.stats.filtered_too_short_after_cleaning:,}개")
+        print(f"⚠️  에러: {self.stats.errors:,}개")
         print(f"\n📁 결과 파일:")
-        print(f"   - {output_file}")
+        print(f"   - {output_path}/reviews_*.jsonl ({len(shard_files)}개 샤드)")
         print(f"   - {stats_file}")
         print("="*60)
         
-        return all_processed_reviews
+        return total_reviews
+
+
+def _process_file_worker(file_path: Path, min_text_length: int) -> tuple:
+    """프로세스 풀 워커: 파일 하나의 리뷰별 전처리 결과 반환 (중복 확인 전)"""
+    return ReviewPreprocessor(min_text_length=min_text_length).evaluate_file(file_path)
 
 
 def main():
@@ -558,12 +696,12 @@ def main():
     )
     
     # 전처리 실행
-    reviews = preprocessor.process_all_files(
+    total_reviews = preprocessor.process_all_files(
         input_dir=input_dir,
         output_dir=output_dir
     )
     
-    print(f"\n총 {len(reviews):,}개의 리뷰가 전처리되어 저장되었습니다.")
+    print(f"\n총 {total_reviews:,}개의 리뷰가 전처리되어 저장되었습니다.")
 
 
 if __name__ == "__main__":